@@ -0,0 +1,17 @@
+// Materialise per-community transaction stats onto :Community nodes
+// Run after run_gds.cypher: community ids change with every Leiden run.
+
+MATCH (c:Community)
+DETACH DELETE c;
+
+MATCH (p:Person)-[:MADE]->(t:Transaction)
+WHERE p.community_id_strong IS NOT NULL
+WITH p.community_id_strong AS cid,
+     count(DISTINCT p) AS people_count,
+     count(t) AS tx_total,
+     sum(CASE WHEN t.is_fraud = 1 THEN 1 ELSE 0 END) AS tx_fraud
+CREATE (c:Community {id: cid})
+SET c.people_count = people_count,
+    c.tx_total = tx_total,
+    c.tx_fraud = tx_fraud,
+    c.fraud_rate = round(1.0 * tx_fraud / tx_total, 4);
@@ -29,3 +29,6 @@ FOR (n:Address) REQUIRE n.address_hash IS UNIQUE;
 
 CREATE CONSTRAINT merchant_id IF NOT EXISTS
 FOR (n:Merchant) REQUIRE n.merchant_id IS UNIQUE;
+
+CREATE CONSTRAINT community_id IF NOT EXISTS
+FOR (n:Community) REQUIRE n.id IS UNIQUE;
@@ -8,3 +8,6 @@ FOR (t:Transaction) ON (t.amount);
 
 CREATE INDEX merchant_mcc IF NOT EXISTS
 FOR (m:Merchant) ON (m.mcc);
+
+CREATE INDEX community_fraud_rate IF NOT EXISTS
+FOR (c:Community) ON (c.fraud_rate);
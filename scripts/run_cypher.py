@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import socketserver
 import sys
 from pathlib import Path
 
@@ -13,14 +14,116 @@ def read_cypher(path: Path) -> str:
 
 
 def split_statements(cypher: str) -> list[str]:
-
-    parts = [p.strip() for p in cypher.split(";")]
-    return [p for p in parts if p]
+    """
+    Split a cypher script on ';' in a single pass.
+    Semicolons inside quoted strings, backtick identifiers and comments are ignored,
+    and empty or comment-only statements are dropped.
+    """
+    statements: list[str] = []
+    start = 0
+    has_code = False
+    quote = None  # one of ' " ` while inside a quoted section
+    i, n = 0, len(cypher)
+    while i < n:
+        ch = cypher[i]
+        if quote:
+            if ch == "\\" and quote != "`":
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+        elif cypher.startswith("//", i):
+            end = cypher.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        elif cypher.startswith("/*", i):
+            end = cypher.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        elif ch in "'\"`":
+            quote = ch
+            has_code = True
+        elif ch == ";":
+            if has_code:
+                statements.append(cypher[start:i].strip())
+            start = i + 1
+            has_code = False
+        elif not ch.isspace():
+            has_code = True
+        i += 1
+
+    if has_code:
+        statements.append(cypher[start:].strip())
+    return statements
+
+
+def run_file(session, f: Path) -> int:
+    cypher = read_cypher(f)
+    statements = split_statements(cypher)
+
+    print(f"\n==> {f} ({len(statements)} statements)")
+    for i, stmt in enumerate(statements, start=1):
+        # Neo4j expects a full statement, no trailing ';'
+        try:
+            session.run(stmt).consume()
+        except Exception as e:
+            print(f"\nERROR in {f} statement #{i}:\n{stmt}\n", file=sys.stderr)
+            raise
+    return len(statements)
+
+
+def serve(driver, database: str, socket_path: str) -> int:
+    """
+    Keep-alive mode: hold one driver (and its connection pool) open and run cypher files
+    sent over a unix socket, one path per connection, e.g.
+
+        echo cypher/build_links_ip.cypher | nc -U /tmp/arachne-cypher.sock
+
+    The reply is one line, "OK <file> (<n> statements)" or "ERROR <file>: <message>",
+    after which the server closes the connection (so clients that don't half-close on EOF don't hang it).
+    """
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            f = Path(self.rfile.readline().decode("utf-8").strip())
+            if not f.name:
+                return
+            try:
+                if not f.exists():
+                    raise FileNotFoundError(f"File not found: {f}")
+                with driver.session(database=database) as session:
+                    n = run_file(session, f)
+                reply = f"OK {f} ({n} statements)"
+            except Exception as e:
+                reply = f"ERROR {f}: {e}"
+            self.wfile.write((reply + "\n").encode("utf-8"))
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    with socketserver.UnixStreamServer(socket_path, Handler) as server:
+        print(f"Serving cypher files on {socket_path} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+    return 0
 
 
 def main() -> int:
+    usage = (
+        "Usage: python scripts/run_cypher.py <file1.cypher> [file2.cypher ...]\n"
+        "       python scripts/run_cypher.py --keep-alive <socket_path>"
+    )
     if len(sys.argv) < 2:
-        print("Usage: python scripts/run_cypher.py <file1.cypher> [file2.cypher ...]", file=sys.stderr)
+        print(usage, file=sys.stderr)
+        return 2
+
+    keep_alive = sys.argv[1] == "--keep-alive"
+    if keep_alive and len(sys.argv) != 3:
+        print(usage, file=sys.stderr)
         return 2
 
     uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
@@ -28,7 +131,7 @@ def main() -> int:
     password = os.getenv("NEO4J_PASSWORD", "password123")
     database = os.getenv("NEO4J_DATABASE", "neo4j")
 
-    files = [Path(p) for p in sys.argv[1:]]
+    files = [] if keep_alive else [Path(p) for p in sys.argv[1:]]
     for f in files:
         if not f.exists():
             print(f"File not found: {f}", file=sys.stderr)
@@ -37,19 +140,12 @@ def main() -> int:
     driver = GraphDatabase.driver(uri, auth=(user, password))
     try:
         driver.verify_connectivity()
+        if keep_alive:
+            return serve(driver, database, sys.argv[2])
+
         with driver.session(database=database) as session:
             for f in files:
-                cypher = read_cypher(f)
-                statements = split_statements(cypher)
-
-                print(f"\n==> {f} ({len(statements)} statements)")
-                for i, stmt in enumerate(statements, start=1):
-                    # Neo4j expects a full statement, no trailing ';'
-                    try:
-                        session.run(stmt).consume()
-                    except Exception as e:
-                        print(f"\nERROR in {f} statement #{i}:\n{stmt}\n", file=sys.stderr)
-                        raise
+                run_file(session, f)
 
         print("\nAll cypher executed successfully.")
         return 0
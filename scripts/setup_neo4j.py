@@ -3,6 +3,8 @@ from __future__ import annotations
 from pathlib import Path
 from neo4j import GraphDatabase # importing neo4j driver with graph database support
 
+from run_cypher import split_statements
+
 
 ROOT = Path(__file__).resolve().parents[1]
 CYPHER_DIR = ROOT / "cypher"
@@ -14,18 +16,17 @@ CYPHER_FILES = [
 ]
 
 
-def run_cypher_file(driver: GraphDatabase.driver, cypher_path: Path) -> None:
+def run_cypher_file(session, cypher_path: Path) -> None:
     text = cypher_path.read_text(encoding="utf-8").strip()
     if not text:
         print(f"SKIP empty: {cypher_path.name}")
         return
 
-    # naive split on semicolons to allow multiple statements per file
-    statements = [s.strip() for s in text.split(";") if s.strip()]
+    # split on semicolons (outside strings/comments) to allow multiple statements per file
+    statements = split_statements(text)
 
-    with driver.session(database="neo4j") as session:
-        for stmt in statements:
-            session.run(stmt)
+    for stmt in statements:
+        session.run(stmt).consume()
 
     print(f"OK: {cypher_path.name} ({len(statements)} statements)")
 
@@ -41,14 +42,15 @@ def main() -> None:
         driver.verify_connectivity()
         print("Successfully Connected to Neo4j")
 
-        for fname in CYPHER_FILES:
-            path = CYPHER_DIR / fname
-            if not path.exists():
-                raise FileNotFoundError(f"Missing cypher file: {path}")
-            run_cypher_file(driver, path)
-
-        # Check GDS installation
+        # One session for every schema file and the GDS check
         with driver.session(database="neo4j") as session:
+            for fname in CYPHER_FILES:
+                path = CYPHER_DIR / fname
+                if not path.exists():
+                    raise FileNotFoundError(f"Missing cypher file: {path}")
+                run_cypher_file(session, path)
+
+            # Check GDS installation
             gds_ok = session.run("RETURN gds.version() AS v").single()
             print(f"GDS version: {gds_ok['v']}")
 
@@ -1,75 +1,128 @@
 from __future__ import annotations
 
+import atexit
+import html
 import os
 from dataclasses import dataclass
 
+import numpy as np
 import streamlit as st
+from matplotlib import colormaps
 from neo4j import GraphDatabase
 import pandas as pd
 
 
-
-def show_table(rows: list[dict], *, sort_by: str | None = None, descending: bool = True):
+# Column -> colormap for the "higher = hotter" highlighting in show_table
+GRADIENT_CMAPS = {
+    "fraud_rate": "Reds",
+    "tx_fraud": "Oranges",
+    "weight": "Purples",
+    "shared_device": "Blues",
+    "shared_card": "Blues",
+    "shared_address": "Blues",
+    "shared_ip": "Blues",
+}
+
+# Display-only labels; applied to the rendered header so the DataFrame isn't copied
+COLUMN_LABELS = {
+    "people_count": "people",
+}
+
+COLUMN_FORMATS = {
+    "fraud_rate": "{:.4f}",
+    "weight": "{:.0f}",
+}
+
+
+def gradient_css(values: np.ndarray, cmap: str) -> list[str]:
+    # Same idea as Styler.background_gradient, but computed for the whole column in one shot
+    vals = values.astype(float)
+    if np.isnan(vals).all():
+        return [""] * len(vals)
+
+    lo, hi = np.nanmin(vals), np.nanmax(vals)
+    norm = (vals - lo) / (hi - lo) if hi > lo else np.zeros_like(vals)
+    rgba = colormaps[cmap](norm)
+    rgb = np.rint(rgba[:, :3] * 255).astype(int)
+
+    # Dark text on light cells, light text on dark cells
+    # Relative luminance of the linearised sRGB channels, as background_gradient computes it
+    srgb = rgba[:, :3]
+    linear = np.where(srgb <= 0.04045, srgb / 12.92, ((srgb + 0.055) / 1.055) ** 2.4)
+    luminance = linear @ np.array([0.2126, 0.7152, 0.0722])
+    css = []
+    for v, (r, g, b), lum in zip(vals, rgb, luminance):
+        if np.isnan(v):
+            css.append("")
+            continue
+        text = "#000000" if lum > 0.408 else "#f1f1f1"
+        css.append(f"background-color: #{r:02x}{g:02x}{b:02x}; color: {text}")
+    return css
+
+
+def show_table(
+    rows: list[dict],
+    *,
+    sort_by: str | None = None,
+    descending: bool = True,
+    columns: list[str] | None = None,
+):
     # For displaying query results nicely in Streamlit
     if not rows:
         st.info("No rows.")
         return
 
-    df = pd.DataFrame(rows)
+    # columns pins the display order for rows built from Cypher maps (key order isn't guaranteed)
+    df = pd.DataFrame(rows, columns=columns)
 
     # Optional sorting
     if sort_by and sort_by in df.columns:
         df = df.sort_values(sort_by, ascending=not descending)
 
-    # Nicer column labels
-    rename = {
-        "tx_total": "tx_total",
-        "tx_fraud": "tx_fraud",
-        "fraud_rate": "fraud_rate",
-        "people_count": "people",
-        "linked_person": "linked_person",
-        "shared_device": "shared_device",
-        "shared_card": "shared_card",
-        "shared_address": "shared_address",
-        "shared_ip": "shared_ip",
-        "weight": "weight",
-        "artifact": "artifact",
-        "tx_count": "tx_count",
-    }
-    df = df.rename(columns={k: v for k, v in rename.items() if k in df.columns})
-
-    styler = df.style
-
-    # Format a few columns cleanly
-    if "fraud_rate" in df.columns:
-        styler = styler.format({"fraud_rate": "{:.4f}"})
-    if "weight" in df.columns:
-        styler = styler.format({"weight": "{:.0f}"})
+    st.markdown(styled_table_html(df), unsafe_allow_html=True)
 
-    # Highlight columns that matter with color gradients
-    # Fraud rate: higher = hotter
-    if "fraud_rate" in df.columns:
-        styler = styler.background_gradient(subset=["fraud_rate"], cmap="Reds")
 
-    # Fraud tx: higher = hotter
-    if "tx_fraud" in df.columns:
-        styler = styler.background_gradient(subset=["tx_fraud"], cmap="Oranges")
+# Styling is the expensive part of rendering a table, so the finished HTML is cached
+# st.cache_data keys on the DataFrame contents: reruns with the same rows skip the Styler entirely
+@st.cache_data(show_spinner=False)
+def styled_table_html(df: pd.DataFrame) -> str:
+    # The HTML goes out through st.markdown(unsafe_allow_html=True), so every cell is escaped
+    # (values come straight from Neo4j: ids, artifacts, names)
+    styler = df.style.format(escape="html")
 
-    # Weight: higher = hotter
-    if "weight" in df.columns:
-        styler = styler.background_gradient(subset=["weight"], cmap="Purples")
+    # Format a few columns cleanly
+    formats = {c: f for c, f in COLUMN_FORMATS.items() if c in df.columns}
+    if formats:
+        styler = styler.format(formats, escape="html")
 
-    # Shared evidence counts: higher = hotter
-    shared_cols = [c for c in ["shared_device", "shared_card", "shared_address", "shared_ip"] if c in df.columns]
-    if shared_cols:
-        styler = styler.background_gradient(subset=shared_cols, cmap="Blues")
+    # Highlight columns that matter with color gradients (higher = hotter)
+    for col, cmap in GRADIENT_CMAPS.items():
+        if col in df.columns:
+            css = gradient_css(pd.to_numeric(df[col], errors="coerce").to_numpy(), cmap)
+            styler = styler.apply(lambda _, css=css: css, subset=[col], axis=0)
 
     # Make it easier to read
-    styler = styler.set_properties(**{"font-size": "0.92rem"}).set_table_styles(
-        [{"selector": "th", "props": [("text-align", "left")]}]
+    styler = (
+        styler.set_properties(**{"font-size": "0.92rem"})
+        .set_table_styles([{"selector": "th", "props": [("text-align", "left")]}])
+        .set_table_attributes('style="width: 100%"')
+        .relabel_index([COLUMN_LABELS.get(c, c) for c in df.columns], axis=1)
+        .hide(axis="index")
     )
-
-    st.dataframe(styler, use_container_width=True, hide_index=True)
+    return styler.to_html()
+
+
+def show_kpis(kpis: list[tuple[str, object] | tuple[str, object, str]]):
+    # All KPI cards go out in one markdown element (one frontend update instead of one per card)
+    # Each entry is (label, value) or (label, value, sub-caption); all are escaped before going into the HTML
+    cards = []
+    for label, value, *sub in kpis:
+        sub_html = f"<div class='kpi-sub'>{html.escape(str(sub[0]))}</div>" if sub else ""
+        cards.append(
+            f"<div class='kpi'><div class='kpi-label'>{html.escape(str(label))}</div>"
+            f"<div class='kpi-value'>{html.escape(str(value))}</div>{sub_html}</div>"
+        )
+    st.markdown(f"<div class='kpi-row'>{''.join(cards)}</div>", unsafe_allow_html=True)
 
 
 @dataclass(frozen=True)
@@ -80,14 +133,41 @@ class Neo4jCfg:
     database: str = os.getenv("NEO4J_DATABASE", "neo4j")
 
 
-def run_query(cfg: Neo4jCfg, cypher: str, params: dict | None = None):
-    driver = GraphDatabase.driver(cfg.uri, auth=(cfg.user, cfg.password))
-    try:
-        with driver.session(database=cfg.database) as session:
-            res = session.run(cypher, params or {})
-            return [r.data() for r in res]
-    finally:
-        driver.close()
+# One driver (and connection pool) per config, shared across reruns and sessions
+# Building a driver per query re-does the pool/handshake setup every time
+@st.cache_resource
+def get_driver(cfg: Neo4jCfg):
+    driver = GraphDatabase.driver(
+        cfg.uri,
+        auth=(cfg.user, cfg.password),
+        max_connection_pool_size=50,
+        connection_acquisition_timeout=30,
+    )
+    atexit.register(driver.close)
+    return driver
+
+
+def _execute(cfg: Neo4jCfg, cypher: str, params: dict):
+    driver = get_driver(cfg)
+    with driver.session(database=cfg.database) as session:
+        res = session.run(cypher, params)
+        return [r.data() for r in res]
+
+
+# Reruns with unchanged inputs are served from memory instead of a Bolt round-trip
+# Params are passed as a sorted tuple so the cache key is hashable and order independent
+@st.cache_data(ttl=60, show_spinner=False)
+def _run_query_cached(uri: str, user: str, password: str, database: str, cypher: str, params_tuple: tuple):
+    cfg = Neo4jCfg(uri=uri, user=user, password=password, database=database)
+    return _execute(cfg, cypher, dict(params_tuple))
+
+
+def run_query(cfg: Neo4jCfg, cypher: str, params: dict | None = None, *, cache: bool = True):
+    params = params or {}
+    if not cache:
+        return _execute(cfg, cypher, params)
+    params_tuple = tuple(sorted(params.items()))
+    return _run_query_cached(cfg.uri, cfg.user, cfg.password, cfg.database, cypher, params_tuple)
 
 
 st.set_page_config(page_title="Arachne Investigator Console", layout="wide")
@@ -108,6 +188,8 @@ st.markdown(
       .kpi-label { font-size: 0.85rem; opacity: 0.75; margin-bottom: 6px; }
       .kpi-value { font-size: 1.55rem; font-weight: 650; line-height: 1.2; }
       .kpi-sub { font-size: 0.85rem; opacity: 0.70; margin-top: 6px; }
+      .kpi-row { display: flex; gap: 1rem; }
+      .kpi-row .kpi { flex: 1; min-width: 0; }
 
       section[data-testid="stSidebar"] .block-container { padding-top: 1rem; }
     </style>
@@ -124,10 +206,13 @@ with st.sidebar:
     st.caption("Uses env vars if set: NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE")
     if st.button("Ping Neo4j"):
         try:
-            out = run_query(cfg, "RETURN 1 AS ok")
+            out = run_query(cfg, "RETURN 1 AS ok", cache=False)
             st.success(f"Connected ({out[0]['ok']})")
         except Exception as e:
             st.error(f"Connection failed: {e}")
+    # Query results are cached for 60s; clear them to force fresh reads after a reload
+    if st.button("Clear cache"):
+        st.cache_data.clear()
 
     st.divider()
     st.header("Search")
@@ -138,35 +223,202 @@ community_id = st.number_input(
     step=1,
 )
 
-st.divider()
-st.subheader("Community members")
+# Panels are split by input: community panels only depend on $cid, suspect panels only on $pid
+# Each query fetches all of its panels in one round-trip; every CALL aggregates with collect()
+# so it always yields exactly one row. Both are cached, so changing one input doesn't re-query the other
+q_community = """
+CALL {
+  MATCH (p:Person)
+  WHERE p.community_id_strong = $cid
+  WITH p.person_id AS person_id
+  ORDER BY person_id
+  RETURN collect(person_id) AS members
+}
+CALL {
+  MATCH (c:Community {id: $cid})
+  RETURN collect({
+    people_count: c.people_count,
+    tx_total: c.tx_total,
+    tx_fraud: c.tx_fraud,
+    fraud_rate: c.fraud_rate
+  }) AS snap
+}
+CALL {
+  MATCH (p:Person)-[:MADE]->(t:Transaction)
+  WHERE p.community_id_strong = $cid
+  WITH p,
+       count(t) AS tx_total,
+       sum(CASE WHEN t.is_fraud = 1 THEN 1 ELSE 0 END) AS tx_fraud
+  WHERE tx_total > 0
+  WITH p, tx_total, tx_fraud, round(1.0 * tx_fraud / tx_total, 4) AS fraud_rate
+  ORDER BY tx_fraud DESC, fraud_rate DESC, tx_total DESC
+  LIMIT 10
+  RETURN collect({
+    person_id: p.person_id,
+    tx_total: tx_total,
+    tx_fraud: tx_fraud,
+    fraud_rate: fraud_rate
+  }) AS top10
+}
+RETURN members, snap, top10;
+"""
 
-q_members = """
-MATCH (p:Person)
-WHERE p.community_id_strong = $cid
-RETURN p.person_id AS person_id
-ORDER BY person_id;
+q_suspect = """
+CALL {
+  MATCH (p:Person {person_id: $pid})-[:MADE]->(t:Transaction)
+  WITH p,
+       count(t) AS tx_total,
+       sum(CASE WHEN t.is_fraud = 1 THEN 1 ELSE 0 END) AS tx_fraud
+  RETURN collect({
+    person_id: p.person_id,
+    community_id_strong: p.community_id_strong,
+    tx_total: tx_total,
+    tx_fraud: tx_fraud,
+    fraud_rate: round(1.0 * tx_fraud / tx_total, 4)
+  }) AS sus
+}
+CALL {
+  MATCH (p:Person {person_id: $pid})-[r:LINKED_TO]-(q:Person)
+  WITH q, r
+  ORDER BY r.w DESC
+  LIMIT 25
+  RETURN collect({
+    linked_person: q.person_id,
+    weight: r.w,
+    shared_device: r.shared_device,
+    shared_card: r.shared_card,
+    shared_address: r.shared_address,
+    shared_ip: r.shared_ip
+  }) AS neigh
+}
+RETURN sus, neigh;
 """
 
-try:
-    member_rows = run_query(cfg, q_members, {"cid": int(community_id)})
-    member_ids = [r["person_id"] for r in member_rows]
+# Reads the per-community stats materialised by cypher/build_communities.cypher
+q_comm = """
+MATCH (c:Community)
+WHERE c.people_count >= 5
+RETURN c.id AS community,
+       c.people_count AS people_count,
+       c.tx_total AS tx_total,
+       c.tx_fraud AS tx_fraud,
+       c.fraud_rate AS fraud_rate
+ORDER BY fraud_rate DESC, tx_fraud DESC
+LIMIT 10;
+"""
 
-    if not member_ids:
-        st.caption("No members found for this community.")
-    else:
-        picked = st.selectbox(
-            "Pick a person in this community",
-            options=member_ids,
-            index=member_ids.index(person_id.strip()) if person_id.strip() in member_ids else 0,
+
+def community_overview(cid: int) -> dict:
+    return run_query(cfg, q_community, {"cid": cid})[0]
+
+
+def suspect_overview(pid: str) -> dict:
+    return run_query(cfg, q_suspect, {"pid": pid})[0]
+
+
+# Each panel is a fragment: its own widgets (member picker, artifact selector) only rerun that panel
+@st.fragment
+def show_members(cid: int, pid: str):
+    try:
+        member_ids = community_overview(cid)["members"]
+
+        if not member_ids:
+            st.caption("No members found for this community.")
+        else:
+            picked = st.selectbox(
+                "Pick a person in this community",
+                options=member_ids,
+                index=member_ids.index(pid) if pid in member_ids else 0,
+            )
+            if st.button("Set as current suspect"):
+                st.session_state["person_id"] = picked
+                st.rerun()
+
+            st.caption(f"{len(member_ids)} people in community {cid}")
+    except Exception as e:
+        st.error(str(e))
+
+
+@st.fragment
+def show_top_communities():
+    try:
+        rows = run_query(cfg, q_comm)
+        show_table(rows, sort_by="fraud_rate", descending=True)
+    except Exception as e:
+        st.error(str(e))
+
+
+@st.fragment
+def show_snapshot(cid: int):
+    try:
+        snap = community_overview(cid)["snap"]
+        if snap:
+            s = snap[0]
+            show_kpis(
+                [
+                    ("People", s["people_count"]),
+                    ("Transactions", s["tx_total"]),
+                    ("Fraud Tx", s["tx_fraud"]),
+                    ("Fraud Rate", s["fraud_rate"], "community_id_strong"),
+                ]
+            )
+        else:
+            st.info("No results for that community_id_strong.")
+    except Exception as e:
+        st.error(str(e))
+
+
+@st.fragment
+def show_top_suspects(cid: int):
+    try:
+        show_table(
+            community_overview(cid)["top10"],
+            sort_by="tx_fraud",
+            descending=True,
+            columns=["person_id", "tx_total", "tx_fraud", "fraud_rate"],
         )
-        if st.button("Set as current suspect"):
-            st.session_state["person_id"] = picked
-            st.rerun()
+    except Exception as e:
+        st.error(str(e))
 
-        st.caption(f"{len(member_ids)} people in community {int(community_id)}")
-except Exception as e:
-    st.error(str(e))
+
+@st.fragment
+def show_suspect(pid: str):
+    try:
+        sus = suspect_overview(pid)["sus"]
+        if sus:
+            s = sus[0]
+            show_kpis(
+                [
+                    ("Person", s["person_id"]),
+                    ("Community", s["community_id_strong"]),
+                    ("Tx Total", s["tx_total"]),
+                    ("Fraud Tx", s["tx_fraud"]),
+                    ("Fraud Rate", s["fraud_rate"]),
+                ]
+            )
+        else:
+            st.warning("Person not found (or has no transactions).")
+    except Exception as e:
+        st.error(str(e))
+
+
+@st.fragment
+def show_neighbours(pid: str):
+    try:
+        show_table(
+            suspect_overview(pid)["neigh"],
+            sort_by="weight",
+            descending=True,
+            columns=["linked_person", "weight", "shared_device", "shared_card", "shared_address", "shared_ip"],
+        )
+    except Exception as e:
+        st.error(str(e))
+
+
+st.divider()
+st.subheader("Community members")
+
+show_members(int(community_id), person_id.strip())
 
 
 if st.button("Use suspect's community"):
@@ -190,136 +442,30 @@ colA, colB = st.columns([1, 1], gap="large")
 
 with colA:
     st.subheader("Top suspicious communities (multi-person)")
-
-    q_comm = """
-    MATCH (p:Person)-[:MADE]->(t:Transaction)
-    WHERE p.community_id_strong IS NOT NULL
-    WITH p.community_id_strong AS community,
-         count(DISTINCT p) AS people_count,
-         count(t) AS tx_total,
-         sum(CASE WHEN t.is_fraud = 1 THEN 1 ELSE 0 END) AS tx_fraud
-    WHERE people_count >= 5
-    RETURN community, people_count, tx_total, tx_fraud,
-           round(1.0 * tx_fraud / tx_total, 4) AS fraud_rate
-    ORDER BY fraud_rate DESC, tx_fraud DESC
-    LIMIT 10;
-    """
-    try:
-        rows = run_query(cfg, q_comm)
-        show_table(rows, sort_by="fraud_rate", descending=True)
-    except Exception as e:
-        st.error(str(e))
+    show_top_communities()
 
     st.subheader("Top fraud suspects in selected community")
 
-    q_top10 = """
-    MATCH (p:Person)-[:MADE]->(t:Transaction)
-    WHERE p.community_id_strong = $cid
-    WITH p,
-        count(t) AS tx_total,
-        sum(CASE WHEN t.is_fraud = 1 THEN 1 ELSE 0 END) AS tx_fraud
-    WHERE tx_total > 0
-    RETURN p.person_id AS person_id,
-        tx_total,
-        tx_fraud,
-        round(1.0 * tx_fraud / tx_total, 4) AS fraud_rate
-    ORDER BY tx_fraud DESC, fraud_rate DESC, tx_total DESC
-    LIMIT 10;
-    """
-
 with colB:
     st.subheader("Community snapshot")
+    show_snapshot(int(community_id))
 
-    q_snap = """
-    MATCH (p:Person)-[:MADE]->(t:Transaction)
-    WHERE p.community_id_strong = $cid
-    WITH count(DISTINCT p) AS people_count,
-         count(t) AS tx_total,
-         sum(CASE WHEN t.is_fraud = 1 THEN 1 ELSE 0 END) AS tx_fraud
-    RETURN people_count, tx_total, tx_fraud,
-           round(1.0 * tx_fraud / tx_total, 4) AS fraud_rate;
-    """
-    try:
-        snap = run_query(cfg, q_snap, {"cid": int(community_id)})
-        if snap:
-            s = snap[0]
-            c1, c2, c3, c4 = st.columns(4, gap="medium")
-            c1.markdown(f"<div class='kpi'><div class='kpi-label'>People</div><div class='kpi-value'>{s['people_count']}</div></div>", unsafe_allow_html=True)
-            c2.markdown(f"<div class='kpi'><div class='kpi-label'>Transactions</div><div class='kpi-value'>{s['tx_total']}</div></div>", unsafe_allow_html=True)
-            c3.markdown(f"<div class='kpi'><div class='kpi-label'>Fraud Tx</div><div class='kpi-value'>{s['tx_fraud']}</div></div>", unsafe_allow_html=True)
-            c4.markdown(f"<div class='kpi'><div class='kpi-label'>Fraud Rate</div><div class='kpi-value'>{s['fraud_rate']}</div><div class='kpi-sub'>community_id_strong</div></div>", unsafe_allow_html=True)
-
-        else:
-            st.info("No results for that community_id_strong.")
-    except Exception as e:
-        st.error(str(e))
-
-try:
-    top10 = run_query(cfg, q_top10, {"cid": int(community_id)})
-    # If you've added the show_table helper, use it; otherwise fallback.
-    if "show_table" in globals():
-        show_table(top10, sort_by="tx_fraud", descending=True)
-    else:
-        st.dataframe(top10, use_container_width=True)
-except Exception as e:
-    st.error(str(e))
+show_top_suspects(int(community_id))
 
 
 st.divider()
 st.subheader("Suspect overview")
 
-q_sus = """
-MATCH (p:Person {person_id: $pid})-[:MADE]->(t:Transaction)
-WITH p,
-     count(t) AS tx_total,
-     sum(CASE WHEN t.is_fraud = 1 THEN 1 ELSE 0 END) AS tx_fraud
-RETURN p.person_id AS person_id,
-       p.community_id_strong AS community_id_strong,
-       tx_total,
-       tx_fraud,
-       round(1.0 * tx_fraud / tx_total, 4) AS fraud_rate;
-"""
-try:
-    sus = run_query(cfg, q_sus, {"pid": person_id.strip()})
-    if sus:
-        s = sus[0]
-        c1, c2, c3, c4, c5 = st.columns(5, gap="medium")
-        c1.markdown(f"<div class='kpi'><div class='kpi-label'>Person</div><div class='kpi-value'>{s['person_id']}</div></div>", unsafe_allow_html=True)
-        c2.markdown(f"<div class='kpi'><div class='kpi-label'>Community</div><div class='kpi-value'>{s['community_id_strong']}</div></div>", unsafe_allow_html=True)
-        c3.markdown(f"<div class='kpi'><div class='kpi-label'>Tx Total</div><div class='kpi-value'>{s['tx_total']}</div></div>", unsafe_allow_html=True)
-        c4.markdown(f"<div class='kpi'><div class='kpi-label'>Fraud Tx</div><div class='kpi-value'>{s['tx_fraud']}</div></div>", unsafe_allow_html=True)
-        c5.markdown(f"<div class='kpi'><div class='kpi-label'>Fraud Rate</div><div class='kpi-value'>{s['fraud_rate']}</div></div>", unsafe_allow_html=True)
-
-    else:
-        st.warning("Person not found (or has no transactions).")
-except Exception as e:
-    st.error(str(e))
+show_suspect(person_id.strip())
 
 st.subheader("Top linked neighbours (evidence)")
 
-q_neigh = """
-MATCH (p:Person {person_id: $pid})-[r:LINKED_TO]-(q:Person)
-RETURN q.person_id AS linked_person,
-       r.w AS weight,
-       r.shared_device AS shared_device,
-       r.shared_card AS shared_card,
-       r.shared_address AS shared_address,
-       r.shared_ip AS shared_ip
-ORDER BY weight DESC
-LIMIT 25;
-"""
-try:
-    neigh = run_query(cfg, q_neigh, {"pid": person_id.strip()})
-    show_table(neigh, sort_by="weight", descending=True)
-except Exception as e:
-    st.error(str(e))
+show_neighbours(person_id.strip())
 
 
 st.divider()
 st.subheader("Community explorer (shared infrastructure)")
 
-tabs = st.tabs(["Cards", "Devices", "Addresses", "IPs"])
-
 q_cards = """
 MATCH (p:Person)-[:MADE]->(:Transaction)-[:PAID_WITH]->(c:Card)
 WHERE p.community_id_strong = $cid
@@ -360,44 +506,38 @@ ORDER BY people_count DESC, tx_count DESC
 LIMIT 20;
 """
 
-cid_param = {"cid": int(community_id)}
+# st.tabs renders (and queries) every tab body on each rerun
+# A radio selector means only the artifact type being viewed hits Neo4j
+artifact_queries = {
+    "Cards": q_cards,
+    "Devices": q_devices,
+    "Addresses": q_addresses,
+    "IPs": q_ips,
+}
 
-with tabs[0]:
-    try:
-        show_table(run_query(cfg, q_cards, cid_param), sort_by="people_count", descending=True)
-    except Exception as e:
-        st.error(str(e))
 
-with tabs[1]:
-    try:
-        show_table(run_query(cfg, q_cards, cid_param), sort_by="people_count", descending=True)
-    except Exception as e:
-        st.error(str(e))
+@st.fragment
+def show_explorer(cid: int):
+    artifact = st.radio("Artifact", options=list(artifact_queries), horizontal=True, key="artifact_tab")
 
-with tabs[2]:
     try:
-        show_table(run_query(cfg, q_cards, cid_param), sort_by="people_count", descending=True)
+        show_table(run_query(cfg, artifact_queries[artifact], {"cid": cid}), sort_by="people_count", descending=True)
     except Exception as e:
         st.error(str(e))
 
-with tabs[3]:
-    try:
-        show_table(run_query(cfg, q_cards, cid_param), sort_by="people_count", descending=True)
-    except Exception as e:
-        st.error(str(e))
+
+show_explorer(int(community_id))
 
 
 st.divider()
 st.markdown("### Case export (copy to report)")
 
 q_case = """
-MATCH (p:Person)-[:MADE]->(t:Transaction)
-WHERE p.community_id_strong = $cid
-WITH count(DISTINCT p) AS people_count,
-     count(t) AS tx_total,
-     sum(CASE WHEN t.is_fraud = 1 THEN 1 ELSE 0 END) AS tx_fraud
-RETURN people_count, tx_total, tx_fraud,
-       round(1.0 * tx_fraud / tx_total, 4) AS fraud_rate;
+MATCH (c:Community {id: $cid})
+RETURN c.people_count AS people_count,
+       c.tx_total AS tx_total,
+       c.tx_fraud AS tx_fraud,
+       c.fraud_rate AS fraud_rate;
 """
 
 q_top_suspects = """
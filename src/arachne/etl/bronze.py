@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import polars as pl
+
+"""
+bronze.py holds the shared readers for the bronze parquet tables.
+
+inject_fraud_rings.py doesn't rewrite transactions.parquet; it writes the rows it changed to a patch file
+next to it. scan_transactions() is the one place that joins that patch back in, so the simulator steps and
+the graph loaders (load_bronze, admin_import) all see the same transactions.
+"""
+
+
+# Low-cardinality ID columns (rings concentrate them further), handled as Categorical in the fraud patch
+# file and the scan_transactions() frame; transactions.parquet itself stores them as String
+ID_COLUMNS = ["person_id", "device_id", "ip", "card_hash", "address_hash"]
+
+# Columns the fraud patch can overwrite; the patch file stores them as f"{col}_new" keyed by row index
+PATCHED_COLUMNS = ["person_id", "ts", "device_id", "ip", "card_hash", "address_hash"]
+FRAUD_PATCH_FILE = "transactions_fraud_patch.parquet"
+
+
+def enable_string_cache() -> None:
+    # Older polars only shares Categorical codes between frames/files under the global string cache;
+    # from 1.32 (pl.Categories) codes are always shared and the toggle is deprecated
+    if not hasattr(pl, "Categories"):
+        pl.enable_string_cache()
+
+
+def apply_fraud_patch(tx: pl.LazyFrame, patch: pl.LazyFrame) -> pl.LazyFrame:
+    # Left join on row index; unpatched rows keep their values via coalesce
+    # The output is one select in the original column order, so untouched columns pass straight through
+    # and the helper columns simply aren't projected (no with_columns + drop pass)
+    names = [c for c in tx.collect_schema().names() if c != "is_fraud"]
+    return (
+        tx.with_row_index("idx")
+        .join(patch, on="idx", how="left")
+        .sort("idx")  # keep the original row order
+        .select(
+            [pl.coalesce(f"{c}_new", c).alias(c) if c in PATCHED_COLUMNS else pl.col(c) for c in names]
+            # Add is_fraud label column: every patched row got a ring member, so it's the rows the join matched
+            # This is for synthetic ground truth to evaluate fraud detection models (not IRL data)
+            # uint8 keeps it small; readers cast it to Int64 for Neo4j
+            + [pl.col("person_id_new").is_not_null().cast(pl.UInt8).alias("is_fraud")]
+        )
+    )
+
+
+def scan_transactions(bronze: Path) -> pl.LazyFrame:
+    # transactions.parquet with the fraud patch applied, if inject_fraud_rings has been run
+    # The ID columns are cast to Categorical so the patch works on integer codes
+    # (readers still get plain strings from to_dicts/CSV)
+    enable_string_cache()
+    tx = pl.scan_parquet(bronze / "transactions.parquet").with_columns(pl.col(ID_COLUMNS).cast(pl.Categorical))
+    patch_path = bronze / FRAUD_PATCH_FILE
+    if not patch_path.exists():
+        return tx
+    return apply_fraud_patch(tx, pl.scan_parquet(patch_path))
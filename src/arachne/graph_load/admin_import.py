@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from pathlib import Path
+import shutil
+import subprocess
+
+import polars as pl
+
+from arachne.etl.bronze import scan_transactions
+
+"""
+admin_import.py is the cold-load alternative to load_bronze.py. Instead of sending rows over Bolt,
+it writes the bronze tables as CSV files with neo4j-admin import headers and then runs an offline
+`neo4j-admin database import full`, which builds the store directly and is much faster on a fresh graph.
+
+Notes:
+- the offline import replaces the whole database and needs it stopped, so it's for initial builds only;
+  incremental loads into a running graph should keep using load_bronze.py
+- run scripts/setup_neo4j.py after the import so constraints and indexes exist
+"""
+
+# label -> (csv file, bronze parquet, bronze column -> neo4j-admin header field)
+NODE_FILES = {
+    "Person": ("people.csv", "people.parquet", {"person_id": "person_id:ID(Person)"}),
+    "Merchant": (
+        "merchants.csv",
+        "merchants.parquet",
+        {"merchant_id": "merchant_id:ID(Merchant)", "mcc": "mcc", "country": "country"},
+    ),
+    "Device": ("devices.csv", "devices.parquet", {"device_id": "device_id:ID(Device)", "device_type": "device_type"}),
+    "IP": ("ips.csv", "ips.parquet", {"ip": "ip:ID(IP)"}),
+    "Card": ("cards.csv", "cards.parquet", {"card_hash": "card_hash:ID(Card)"}),
+    "Address": (
+        "addresses.csv",
+        "addresses.parquet",
+        {"address_hash": "address_hash:ID(Address)", "postcode": "postcode"},
+    ),
+}
+
+# relationship type -> (csv file, (start column, start id space), (end column, end id space))
+# All relationships come from transactions.parquet
+REL_FILES = {
+    "MADE": ("made.csv", ("person_id", "Person"), ("tx_id", "Transaction")),
+    "TO_MERCHANT": ("to_merchant.csv", ("tx_id", "Transaction"), ("merchant_id", "Merchant")),
+    "USED_DEVICE": ("used_device.csv", ("tx_id", "Transaction"), ("device_id", "Device")),
+    "FROM_IP": ("from_ip.csv", ("tx_id", "Transaction"), ("ip", "IP")),
+    "PAID_WITH": ("paid_with.csv", ("tx_id", "Transaction"), ("card_hash", "Card")),
+    "BILLED_TO": ("billed_to.csv", ("tx_id", "Transaction"), ("address_hash", "Address")),
+}
+
+
+def export_for_admin_import(bronze: Path, out_dir: Path) -> tuple[dict[str, Path], dict[str, Path]]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    nodes: dict[str, Path] = {}
+    rels: dict[str, Path] = {}
+
+    for label, (csv_name, parquet_name, header) in NODE_FILES.items():
+        id_col = next(iter(header))
+        df = (
+            pl.scan_parquet(bronze / parquet_name)
+            .select(list(header))
+            # neo4j-admin rejects duplicate ids (randomly generated IPs can repeat)
+            .unique(subset=[id_col], keep="first", maintain_order=True)
+            .rename(header)
+            .collect()
+        )
+        df.write_csv(out_dir / csv_name)
+        nodes[label] = out_dir / csv_name
+
+    # Base transactions with the fraud-ring patch applied (adds is_fraud)
+    # Collected once: every CSV below is a projection of the same frame, so the parquet read,
+    # patch join and sort aren't repeated per file
+    tx = scan_transactions(bronze).collect()
+
+    tx.select(
+        pl.col("tx_id").alias("tx_id:ID(Transaction)"),
+        pl.col("ts").dt.convert_time_zone("UTC").dt.to_string("%Y-%m-%dT%H:%M:%S%.fZ").alias("ts:datetime"),
+        pl.col("amount").cast(pl.Float64).alias("amount:float"),
+        pl.col("currency"),
+        pl.col("is_fraud").cast(pl.Int64).alias("is_fraud:int"),
+    ).write_csv(out_dir / "transactions.csv")
+    nodes["Transaction"] = out_dir / "transactions.csv"
+
+    for rel_type, (csv_name, (start_col, start_space), (end_col, end_space)) in REL_FILES.items():
+        tx.select(
+            pl.col(start_col).alias(f":START_ID({start_space})"),
+            pl.col(end_col).alias(f":END_ID({end_space})"),
+        ).write_csv(out_dir / csv_name)
+        rels[rel_type] = out_dir / csv_name
+
+    return nodes, rels
+
+
+def admin_import_command(
+    nodes: dict[str, Path], rels: dict[str, Path], database: str = "neo4j", neo4j_admin: str = "neo4j-admin"
+) -> list[str]:
+    cmd = [neo4j_admin, "database", "import", "full", "--overwrite-destination=true"]
+    cmd += [f"--nodes={label}={path}" for label, path in nodes.items()]
+    cmd += [f"--relationships={rel_type}={path}" for rel_type, path in rels.items()]
+    cmd.append(database)
+    return cmd
+
+
+def main() -> None:
+    bronze = Path("data/bronze")
+    out_dir = Path("data/exports/admin_import")
+
+    nodes, rels = export_for_admin_import(bronze, out_dir)
+    print(f"Wrote neo4j-admin import CSVs to {out_dir}")
+
+    cmd = admin_import_command(nodes, rels)
+    if shutil.which(cmd[0]) is None:
+        # e.g. Neo4j running in docker: copy the CSVs into the container and run the command there
+        print("neo4j-admin not found on PATH; run this with the database stopped:")
+        print(" ".join(cmd))
+        return
+
+    subprocess.run(cmd, check=True)
+    print("Admin import finished; run scripts/setup_neo4j.py to apply constraints and indexes")
+
+
+if __name__ == "__main__":
+    main()
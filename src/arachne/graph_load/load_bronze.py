@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import polars as pl # because polars is faster than pandas for parquet I/O
 from neo4j import GraphDatabase
 
+from arachne.etl.bronze import scan_transactions
+
 
 # Chunking lists into smaller batches since Neo4j performs better with smaller UNWINDs
 # and the transaction data is quite large
@@ -12,6 +15,35 @@ def chunked(seq, size: int):
         yield seq[i : i + size]
 
 
+# Node labels are independent of each other, so each label loads on its own worker/session
+NODE_LOAD_WORKERS = 6
+
+
+# Defining merge nodes
+# Basically: if the node exists, reuse it, else create it
+# Since uniqueness constraints are already created (uniqueness cypher), MERGE should be safe and prevent duplicates
+# Sessions are not thread safe, so every call opens its own session on the shared driver
+# Node merges are cheap, so batches can be much larger than for transactions
+def merge_nodes(driver, database: str, query: str, rows: list, batch_size: int = 10_000) -> int:
+    with driver.session(database=database) as session:
+        for batch in chunked(rows, batch_size):
+            session.execute_write(write_batch, query, batch)
+    return len(rows)
+
+
+# Unit of work for execute_write: one managed transaction per batch
+# The driver commits it once and retries it on transient errors (MERGE keeps retries idempotent)
+def write_batch(tx, query: str, rows: list) -> None:
+    tx.run(query, rows=rows).consume()
+
+
+# Same as write_batch but clears out the batch's existing transactions first,
+# so the create query never has to check for duplicate relationships
+def replace_batch(tx, delete_query: str, create_query: str, rows: list) -> None:
+    tx.run(delete_query, rows=rows).consume()
+    tx.run(create_query, rows=rows).consume()
+
+
 def main() -> None:
     # Match configs/arachne.yml defaults
     uri = "bolt://localhost:7687"
@@ -20,159 +52,175 @@ def main() -> None:
     database = "neo4j"
 
     # Load bronze parquet files
+    # scan_parquet + select only reads the columns that are sent to Neo4j
     bronze = Path("data/bronze")
-    people = pl.read_parquet(bronze / "people.parquet")
-    merchants = pl.read_parquet(bronze / "merchants.parquet")
-    devices = pl.read_parquet(bronze / "devices.parquet")
-    ips = pl.read_parquet(bronze / "ips.parquet")
-    cards = pl.read_parquet(bronze / "cards.parquet")
-    addrs = pl.read_parquet(bronze / "addresses.parquet")
-    tx = pl.read_parquet(bronze / "transactions.parquet")
+
+    def read_cols(name: str, cols: list[str]) -> pl.DataFrame:
+        return pl.scan_parquet(bronze / name).select(cols).collect()
 
     # Convert polars dataframes into rows (list of dicts) needed for Neo4j UNWIND
-    people_rows = people.select(["person_id"]).to_dicts()
-    merchant_rows = merchants.select(["merchant_id", "mcc", "country"]).to_dicts()
-    device_rows = devices.select(["device_id", "device_type"]).to_dicts()
-    ip_rows = ips.select(["ip"]).to_dicts()
-    card_rows = cards.select(["card_hash"]).to_dicts()
-    addr_rows = addrs.select(["address_hash", "postcode"]).to_dicts()
-
-    # Selecting only the necessary fields for transactions
-    tx_rows = tx.select(
-        [
-            "tx_id",
-            "ts",
-            "amount",
-            "currency",
-            "person_id",
-            "merchant_id",
-            "device_id",
-            "ip",
-            "card_hash",
-            "address_hash",
-            "is_fraud",
-        ]
-    ).to_dicts()
+    # Single-column tables are sent as plain value lists, which are cheaper to encode than maps
+    people_rows = read_cols("people.parquet", ["person_id"])["person_id"].to_list()
+    merchant_rows = read_cols("merchants.parquet", ["merchant_id", "mcc", "country"]).to_dicts()
+    device_rows = read_cols("devices.parquet", ["device_id", "device_type"]).to_dicts()
+    ip_rows = read_cols("ips.parquet", ["ip"])["ip"].to_list()
+    card_rows = read_cols("cards.parquet", ["card_hash"])["card_hash"].to_list()
+    addr_rows = read_cols("addresses.parquet", ["address_hash", "postcode"]).to_dicts()
+
+    # Selecting only the necessary fields for transactions (fraud patch applied on the way in)
+    # Kept as a dataframe: rows are converted to dicts one batch at a time during the load
+    tx = (
+        scan_transactions(bronze)
+        .select(
+            [
+                "tx_id",
+                "ts",
+                "amount",
+                "currency",
+                "person_id",
+                "merchant_id",
+                "device_id",
+                "ip",
+                "card_hash",
+                "address_hash",
+                "is_fraud",
+            ]
+        )
+        .with_columns(
+            # Typed here so the Cypher can store the values as sent (no toFloat/toInteger per row)
+            pl.col("amount").cast(pl.Float64),
+            pl.col("is_fraud").cast(pl.Int64),
+        )
+        .collect()
+    )
 
     # Connect to Neo4j
+    # The pool must fit one session per node-load worker; the driver default (100 connections) already does
     driver = GraphDatabase.driver(uri, auth=(user, password))
     try:
         driver.verify_connectivity()
         print("Connected to Neo4j")
 
-        with driver.session(database=database) as session:
-            # Defining merge nodes
-            # Basically: if the node exists, reuse it, else create it
-            # Since uniqueness constraints are already created (uniqueness cypher), MERGE should be safe and prevent duplicates
-            def merge_nodes(query: str, rows: list[dict], batch_size: int = 5000):
-                for batch in chunked(rows, batch_size):
-                    session.run(query, rows=batch)
-
-            merge_nodes(
+        node_loads = [
+            (
+                "Person",
                 """
-                UNWIND $rows AS r
-                MERGE (:Person {person_id: r.person_id})
+                UNWIND $rows AS person_id
+                MERGE (:Person {person_id: person_id})
                 """,
                 people_rows,
-            )
-            print(f"Loaded Person: {len(people_rows)}")
-
-            merge_nodes(
+            ),
+            (
+                "Merchant",
                 """
                 UNWIND $rows AS r
                 MERGE (m:Merchant {merchant_id: r.merchant_id})
                 SET m.mcc = r.mcc, m.country = r.country
                 """,
                 merchant_rows,
-            )
-            print(f"Loaded Merchant: {len(merchant_rows)}")
-
-            merge_nodes(
+            ),
+            (
+                "Device",
                 """
                 UNWIND $rows AS r
                 MERGE (d:Device {device_id: r.device_id})
                 SET d.device_type = r.device_type
                 """,
                 device_rows,
-            )
-            print(f"Loaded Device: {len(device_rows)}")
-
-            merge_nodes(
+            ),
+            (
+                "IP",
                 """
-                UNWIND $rows AS r
-                MERGE (:IP {ip: r.ip})
+                UNWIND $rows AS ip
+                MERGE (:IP {ip: ip})
                 """,
                 ip_rows,
-            )
-            print(f"Loaded IP: {len(ip_rows)}")
-
-            merge_nodes(
+            ),
+            (
+                "Card",
                 """
-                UNWIND $rows AS r
-                MERGE (:Card {card_hash: r.card_hash})
+                UNWIND $rows AS card_hash
+                MERGE (:Card {card_hash: card_hash})
                 """,
                 card_rows,
-            )
-            print(f"Loaded Card: {len(card_rows)}")
-
-            merge_nodes(
+            ),
+            (
+                "Address",
                 """
                 UNWIND $rows AS r
                 MERGE (a:Address {address_hash: r.address_hash})
                 SET a.postcode = r.postcode
                 """,
                 addr_rows,
-            )
-            print(f"Loaded Address: {len(addr_rows)}")
+            ),
+        ]
+
+        with ThreadPoolExecutor(max_workers=NODE_LOAD_WORKERS) as pool:
+            futures = {
+                pool.submit(merge_nodes, driver, database, query, rows): label
+                for label, query, rows in node_loads
+            }
+            for fut in as_completed(futures):
+                print(f"Loaded {futures[fut]}: {fut.result()}")
+
+        # Transactions need every node above to exist, so they load afterwards on a single session
+        with driver.session(database=database) as session:
             """
             #Transactions + relationships
-             Creates transaction nodes (or reuses existing ones) and sets properties:
-             - Python datetime -> Neo4j datetime conversion
-             - amount is casted to float
-             - is_fraud is casted to integeric binary flag (0/1)
+             Creates transaction nodes and sets properties:
+             - ts is sent as a Python datetime, which the driver encodes as a native Neo4j datetime
+             - amount (float) and is_fraud (integer binary flag 0/1) are already cast in polars
 
              Also creates relationships using MATCH to find existing nodes,
              this should ensure the correct links are established for persons, merchants, devices, IPs, cards, and addresses
 
              SUMMARY:
              - MATCH ensures nodes exist before creating relationships
-             - MERGE ensures the relationship isn't duplicated on multiple runs
+             - transactions already in the graph are DETACH DELETEd first (same managed transaction),
+               so relationships are CREATEd outright and re-runs don't duplicate them
             """
+            tx_delete_query = """
+            UNWIND $rows AS r
+            MATCH (t:Transaction {tx_id: r.tx_id})
+            DETACH DELETE t
+            """
+
             tx_query = """
             UNWIND $rows AS r
 
             // Transaction node
-            MERGE (t:Transaction {tx_id: r.tx_id})
-            SET t.ts = datetime(r.ts),
-                t.amount = toFloat(r.amount),
+            CREATE (t:Transaction {tx_id: r.tx_id})
+            SET t.ts = r.ts,
+                t.amount = r.amount,
                 t.currency = r.currency,
-                t.is_fraud = toInteger(r.is_fraud)
+                t.is_fraud = r.is_fraud
 
             WITH r, t
 
-            // Match all referenced nodes in one clause
-            MATCH (p:Person   {person_id: r.person_id}),
-                (m:Merchant {merchant_id: r.merchant_id}),
-                (d:Device   {device_id: r.device_id}),
-                (ip:IP      {ip: r.ip}),
-                (c:Card     {card_hash: r.card_hash}),
-                (a:Address  {address_hash: r.address_hash})
+            // Match referenced nodes one clause at a time so each lookup is a
+            // unique-index seek rather than one comma-separated pattern
+            MATCH (p:Person {person_id: r.person_id})
+            MATCH (m:Merchant {merchant_id: r.merchant_id})
+            MATCH (d:Device {device_id: r.device_id})
+            MATCH (ip:IP {ip: r.ip})
+            MATCH (c:Card {card_hash: r.card_hash})
+            MATCH (a:Address {address_hash: r.address_hash})
 
             // Relationships
-            MERGE (p)-[:MADE]->(t)
-            MERGE (t)-[:TO_MERCHANT]->(m)
-            MERGE (t)-[:USED_DEVICE]->(d)
-            MERGE (t)-[:FROM_IP]->(ip)
-            MERGE (t)-[:PAID_WITH]->(c)
-            MERGE (t)-[:BILLED_TO]->(a)
+            CREATE (p)-[:MADE]->(t)
+            CREATE (t)-[:TO_MERCHANT]->(m)
+            CREATE (t)-[:USED_DEVICE]->(d)
+            CREATE (t)-[:FROM_IP]->(ip)
+            CREATE (t)-[:PAID_WITH]->(c)
+            CREATE (t)-[:BILLED_TO]->(a)
             """
 
             # Since the transaction query covers many labels, rows, and creats many relationships
             # Chunking into smaller batches to avoid transaction timeouts / memory issues
-            for batch in chunked(tx_rows, 1500):
-                session.run(tx_query, rows=batch)
+            for batch in tx.iter_slices(1500):
+                session.execute_write(replace_batch, tx_delete_query, tx_query, batch.to_dicts())
 
-            print(f"Loaded Transaction + rels: {len(tx_rows)}")
+            print(f"Loaded Transaction + rels: {tx.height}")
             print("Done")
 
     finally:
@@ -2,10 +2,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-import random
 
+import numpy as np
 import polars as pl
 
+from arachne.etl.bronze import FRAUD_PATCH_FILE
+from arachne.simulator.generate_bronze import _make_ids
+
 """
 enrich_infrastructure.py serves to create infrastructure reference data which is shared between
 transaction entities. It generates devices, IPs, cards, and addresses, and then enriches existing
@@ -29,46 +32,43 @@ class InfraConfig:
     # Lower => more unique infra per transaction and higher => more re-use
     reuse_strength: float = 0.25
 
-# make IDs with fixed width numeric suffixes
-def _make_ids(prefix: str, n: int, width: int) -> list[str]:
-    return [f"{prefix}{i:0{width}d}" for i in range(n)]
-
 
-def _random_ipv4() -> str:
+def _random_ipv4(rng: np.random.Generator) -> str:
     # Private ranges to avoid accidental use of real-world IPs in examples
-    a = random.choice([10, 172, 192])
+    # (rng.integers upper bounds are exclusive)
+    a = rng.choice([10, 172, 192])
     if a == 10:
-        return f"10.{random.randint(0,255)}.{random.randint(0,255)}.{random.randint(1,254)}"
+        return f"10.{rng.integers(0, 256)}.{rng.integers(0, 256)}.{rng.integers(1, 255)}"
     if a == 172:
-        return f"172.{random.randint(16,31)}.{random.randint(0,255)}.{random.randint(1,254)}"
-    return f"192.168.{random.randint(0,255)}.{random.randint(1,254)}"
+        return f"172.{rng.integers(16, 32)}.{rng.integers(0, 256)}.{rng.integers(1, 255)}"
+    return f"192.168.{rng.integers(0, 256)}.{rng.integers(1, 255)}"
 
 
-def _sample_with_reuse(pool: list[str], n: int, reuse_strength: float) -> list[str]:
+def _sample_with_reuse(pool: pl.Series, n: int, reuse_strength: float, rng: np.random.Generator) -> pl.Series:
     """
     Returns n samples from pool with controllable re-use.
     reuse_strength ~ 0 => near-uniform random
     reuse_strength ~ 1 => heavy preference for a smaller concentrated "hot" subset
     more reuse means more shared infra between transactions and more actionable fraud patterns to emerge
     """
-    if not pool:
+    if len(pool) == 0:
         raise ValueError("empty pool")
 
-    hot_k = max(10, int(len(pool) * max(0.02, min(0.2, reuse_strength))))
-    hot = pool[:hot_k]
+    hot_k = min(len(pool), max(10, int(len(pool) * max(0.02, min(0.2, reuse_strength)))))
 
-    out: list[str] = []
-    for _ in range(n):
-        if random.random() < reuse_strength:
-            out.append(random.choice(hot))
-        else:
-            out.append(random.choice(pool))
-    return out
+    # Draw every pick in one go: a "hot" index where the reuse coin lands, a uniform one otherwise
+    mask = rng.random(n) < reuse_strength
+    hot_idx = rng.integers(0, hot_k, size=n)
+    pool_idx = rng.integers(0, len(pool), size=n)
+    idx = np.where(mask, hot_idx, pool_idx)
+
+    # gather copies straight out of the Arrow buffers, so the strings never become Python objects
+    return pool.gather(idx)
 
 
 def main() -> None:
     cfg = InfraConfig()
-    random.seed(cfg.seed)
+    rng = np.random.default_rng(cfg.seed)
 
     bronze_dir = Path("data/bronze")
     tx_path = bronze_dir / "transactions.parquet"
@@ -79,7 +79,7 @@ def main() -> None:
 
     # Build infrastructure reference tables
     device_ids = _make_ids("D", cfg.n_devices, 7)
-    ip_values = [_random_ipv4() for _ in range(cfg.n_ips)]
+    ip_values = pl.Series([_random_ipv4(rng) for _ in range(cfg.n_ips)])
     card_hashes = _make_ids("C", cfg.n_cards, 8)
     address_hashes = _make_ids("A", cfg.n_addresses, 7)
 
@@ -91,10 +91,10 @@ def main() -> None:
     # Enrich transactions with infra references 
     n = tx.height
     tx_enriched = tx.with_columns(
-        pl.Series("device_id", _sample_with_reuse(device_ids, n, cfg.reuse_strength)),
-        pl.Series("ip", _sample_with_reuse(ip_values, n, cfg.reuse_strength)),
-        pl.Series("card_hash", _sample_with_reuse(card_hashes, n, cfg.reuse_strength)),
-        pl.Series("address_hash", _sample_with_reuse(address_hashes, n, cfg.reuse_strength)),
+        _sample_with_reuse(device_ids, n, cfg.reuse_strength, rng).alias("device_id"),
+        _sample_with_reuse(ip_values, n, cfg.reuse_strength, rng).alias("ip"),
+        _sample_with_reuse(card_hashes, n, cfg.reuse_strength, rng).alias("card_hash"),
+        _sample_with_reuse(address_hashes, n, cfg.reuse_strength, rng).alias("address_hash"),
     )
 
     # Write to parquet
@@ -102,7 +102,17 @@ def main() -> None:
     ips.write_parquet(bronze_dir / "ips.parquet")
     cards.write_parquet(bronze_dir / "cards.parquet")
     addresses.write_parquet(bronze_dir / "addresses.parquet")
-    tx_enriched.write_parquet(tx_path)
+    # This is the final write of transactions.parquet (inject_fraud_rings only writes a patch next to it)
+    # Explicit zstd + 128k-row groups: smaller file, and readers can decode row groups in parallel
+    tx_enriched.write_parquet(
+        tx_path,
+        compression="zstd",
+        compression_level=3,
+        row_group_size=128_000,
+        statistics=True,
+    )
+    # A fraud patch from an earlier run is keyed by row index into the old table, so it no longer applies
+    (bronze_dir / FRAUD_PATCH_FILE).unlink(missing_ok=True)
 
     print("Wrote devices/ips/cards/addresses and updated transactions.parquet")
 
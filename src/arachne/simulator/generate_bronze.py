@@ -2,9 +2,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-import random
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 
+import numpy as np
 import polars as pl
 
 """
@@ -25,6 +25,12 @@ class SimConfig:
     n_merchants: int = 120
     n_transactions: int = 50_000
 
+
+# make IDs with fixed width numeric suffixes (string formatting runs inside polars)
+def _make_ids(prefix: str, n: int, width: int) -> pl.Series:
+    return pl.select(pl.lit(prefix) + pl.int_range(n).cast(pl.Utf8).str.zfill(width)).to_series()
+
+
 """
 the generate_people method creates a dataframe with fixed-width person IDs and
 a created_at timestamp for each person that later can be randomized for realism
@@ -33,7 +39,7 @@ a created_at timestamp for each person that later can be randomized for realism
 def generate_people(cfg: SimConfig) -> pl.DataFrame:
     return pl.DataFrame(
         {
-            "person_id": [f"P{idx:06d}" for idx in range(cfg.n_people)],
+            "person_id": _make_ids("P", cfg.n_people, 6),
             "created_at": [datetime(2024, 1, 1, tzinfo=timezone.utc)] * cfg.n_people,
         }
     )
@@ -43,13 +49,13 @@ the generate_merchants method creates a dataframe with fixed-width merchant IDs
 a simple distribution of merchant category codes (MCCs)
 """
 
-def generate_merchants(cfg: SimConfig) -> pl.DataFrame:
+def generate_merchants(cfg: SimConfig, rng: np.random.Generator) -> pl.DataFrame:
     # Simple MCC (merchant category code) distribution placeholder
     mccs = ["5411", "5812", "5999", "5732", "4111", "4814", "6011"] # Grocery, Restaurant, Misc Retail, Electronics, Gas Station, Telecom, ATM
     return pl.DataFrame(
         {
-            "merchant_id": [f"M{idx:05d}" for idx in range(cfg.n_merchants)],
-            "mcc": [random.choice(mccs) for _ in range(cfg.n_merchants)],
+            "merchant_id": _make_ids("M", cfg.n_merchants, 5),
+            "mcc": rng.choice(mccs, size=cfg.n_merchants),
             "country": ["GB"] * cfg.n_merchants,
         }
     )
@@ -63,23 +69,26 @@ Transaction amounts are randomly generated between £1.50 and £400.00. Each tra
 a random person ID and merchant ID from the previously generated dataframes.
 """
 
-def generate_transactions(cfg: SimConfig, people: pl.DataFrame, merchants: pl.DataFrame) -> pl.DataFrame:
+def generate_transactions(
+    cfg: SimConfig, people: pl.DataFrame, merchants: pl.DataFrame, rng: np.random.Generator
+) -> pl.DataFrame:
     start = datetime(2025, 1, 1, tzinfo=timezone.utc)
-    person_ids = people["person_id"].to_list()
-    merchant_ids = merchants["merchant_id"].to_list()
+    n = cfg.n_transactions
 
-    tx_ids = [f"T{idx:08d}" for idx in range(cfg.n_transactions)]
-    ts = [start + timedelta(seconds=random.randint(0, 60 * 60 * 24 * 30)) for _ in range(cfg.n_transactions)]
-    amounts = [round(random.uniform(1.5, 400.0), 2) for _ in range(cfg.n_transactions)]
+    # All columns are drawn as numpy vectors and handed to polars directly (no per-row Python objects)
+    tx_ids = _make_ids("T", n, 8)
+    seconds = rng.integers(0, 60 * 60 * 24 * 30, size=n, endpoint=True)
+    ts = pl.select(pl.lit(start) + pl.duration(seconds=pl.Series(seconds))).to_series()
+    amounts = np.round(rng.uniform(1.5, 400.0, size=n), 2)
 
     return pl.DataFrame(
         {
             "tx_id": tx_ids,
             "ts": ts,
             "amount": amounts,
-            "currency": ["GBP"] * cfg.n_transactions,
-            "person_id": [random.choice(person_ids) for _ in range(cfg.n_transactions)],
-            "merchant_id": [random.choice(merchant_ids) for _ in range(cfg.n_transactions)],
+            "currency": pl.repeat("GBP", n, eager=True),
+            "person_id": people["person_id"].gather(rng.integers(0, people.height, size=n)),
+            "merchant_id": merchants["merchant_id"].gather(rng.integers(0, merchants.height, size=n)),
         }
     )
 
@@ -93,11 +102,11 @@ def write_bronze(out_dir: Path, people: pl.DataFrame, merchants: pl.DataFrame, t
 
 def main() -> None:
     cfg = SimConfig()
-    random.seed(cfg.seed)
+    rng = np.random.default_rng(cfg.seed)
 
     people = generate_people(cfg)
-    merchants = generate_merchants(cfg)
-    tx = generate_transactions(cfg, people, merchants)
+    merchants = generate_merchants(cfg, rng)
+    tx = generate_transactions(cfg, people, merchants, rng)
 
     write_bronze(Path("data/bronze"), people, merchants, tx)
     print("Wrote bronze parquet files to data/bronze")
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import timedelta
 from pathlib import Path
 import random
 
+import numpy as np
 import polars as pl
 
+from arachne.etl.bronze import FRAUD_PATCH_FILE, enable_string_cache
+
 """
 inject_fraud_rings.py serves to modify an existing transactions dataset by injecting synthetic
 fraud rings. Fraud rings are groups of individuals who collaborate to commit fraudulent activities,
@@ -21,6 +23,10 @@ Here are the key functionalities of the script:
     forces shared infrastructure usage (device, IP, card, address) among ring members based on configurable probabilities.
 - Adds an is_fraud label column to the transactions dataset to indicate which transactions were modified as
 synthetic ground truth for evaluation.
+
+Only the modified rows are written, to transactions_fraud_patch.parquet next to transactions.parquet
+(which is left as enrich_infrastructure wrote it). Readers go through arachne.etl.bronze.scan_transactions(),
+which joins the patch back in and adds is_fraud.
 """
 
 @dataclass(frozen=True)
@@ -44,121 +50,149 @@ class RingConfig:
     burst_hours_window: int = 48
 
 
-def _choose_hot(pool: list[str], k: int) -> list[str]:
+def _choose_hot(path: Path, col: str, share: float, min_k: int) -> pl.Series:
     # biased towards first slice
-    k = max(1, min(k, len(pool)))
-    return pool[:k]
+    # Only that slice is decoded: the row count comes from the parquet footer, and the memory-mapped
+    # read stops after the first k rows of the one column
+    n = pl.scan_parquet(path).select(pl.len()).collect().item()
+    k = max(1, min(max(min_k, int(n * share)), n))
+    return pl.read_parquet(path, columns=[col], n_rows=k, memory_map=True).to_series().cast(pl.Categorical)
 
 
 def main() -> None:
     cfg = RingConfig()
-    random.seed(cfg.seed)
+    # Ring setup uses a private random.Random (same stream as seeding the module, without the shared
+    # global instance); the per-transaction draws are made in bulk with numpy
+    rnd = random.Random(cfg.seed)
+    rng = np.random.default_rng(cfg.seed)
+    enable_string_cache()
 
     bronze = Path("data/bronze")
-    people = pl.read_parquet(bronze / "people.parquet")
-    tx = pl.read_parquet(bronze / "transactions.parquet")
 
-    devices = pl.read_parquet(bronze / "devices.parquet")["device_id"].to_list()
-    ips = pl.read_parquet(bronze / "ips.parquet")["ip"].to_list()
-    cards = pl.read_parquet(bronze / "cards.parquet")["card_hash"].to_list()
-    addrs = pl.read_parquet(bronze / "addresses.parquet")["address_hash"].to_list()
+    # People only contribute one column, so scan + select skips the rest of the file
+    # IDs are read as Categorical: rings and shared infra are picked by gathering codes, and the
+    # patch is written with the same dtype scan_transactions() uses, so no strings are looked up
+    def read_col(name: str, col: str) -> pl.Series:
+        return pl.scan_parquet(bronze / name).select(pl.col(col).cast(pl.Categorical)).collect().to_series()
 
-    person_ids = people["person_id"].to_list()
+    # Transactions stay lazy and are never rewritten: only the row count and the anchor timestamps are read
+    tx = pl.scan_parquet(bronze / "transactions.parquet")
+
+    person_ids = read_col("people.parquet", "person_id")
 
     # Choosing ring membership
-    random.shuffle(person_ids)
-    rings: list[list[str]] = []
+    # Rings are consecutive slices of the shuffled people, stored CSR style: ring r's members are
+    # ring_members[ring_offsets[r] : ring_offsets[r + 1]]
+    # Shuffling row positions draws the same as shuffling the ids themselves
+    order = list(range(len(person_ids)))
+    rnd.shuffle(order)
+    ring_sizes: list[int] = []
     cursor = 0
+    randint = rnd.randint
     for ring_id in range(cfg.n_rings):
-        size = random.randint(cfg.ring_size_min, cfg.ring_size_max)
+        size = randint(cfg.ring_size_min, cfg.ring_size_max)
         if cursor + size > len(person_ids):
             break
-        rings.append(person_ids[cursor : cursor + size])
+        ring_sizes.append(size)
         cursor += size
 
-    if not rings:
+    if not ring_sizes:
         raise RuntimeError("No rings created; increase n_people or reduce ring sizes.")
 
+    n_rings = len(ring_sizes)
+    ring_members = person_ids.gather(order[:cursor])
+    ring_offsets = np.cumsum([0] + ring_sizes)
+
     # Determine how many transaction rows will be converted into fraud ring transactions
-    n_total = tx.height
+    n_total = tx.select(pl.len()).collect().item()
     n_fraud = int(n_total * cfg.fraud_tx_share)
     if n_fraud <= 0:
         raise ValueError("fraud_tx_share too small; yields 0 fraud transactions.")
 
     # Pick transaction indices to modify
-    fraud_idx = random.sample(range(n_total), k=min(n_fraud, n_total))
-
-    tx_person = tx["person_id"].to_list()
-    tx_ts = tx["ts"].to_list()
-    tx_device = tx["device_id"].to_list()
-    tx_ip = tx["ip"].to_list()
-    tx_card = tx["card_hash"].to_list()
-    tx_addr = tx["address_hash"].to_list()
+    # An int64 ndarray from the numpy rng, which gather/join take without building a Python list
+    fraud_idx = rng.choice(n_total, size=min(n_fraud, n_total), replace=False)
 
     # Predetermine “hot pools” so ring infrastructure feature reuse is obvious
-    hot_devices = _choose_hot(devices, k=max(30, int(len(devices) * 0.03)))
-    hot_ips = _choose_hot(ips, k=max(40, int(len(ips) * 0.04)))
-    hot_cards = _choose_hot(cards, k=max(30, int(len(cards) * 0.03)))
-    hot_addrs = _choose_hot(addrs, k=max(25, int(len(addrs) * 0.03)))
+    hot_devices = _choose_hot(bronze / "devices.parquet", "device_id", share=0.03, min_k=30)
+    hot_ips = _choose_hot(bronze / "ips.parquet", "ip", share=0.04, min_k=40)
+    hot_cards = _choose_hot(bronze / "cards.parquet", "card_hash", share=0.03, min_k=30)
+    hot_addrs = _choose_hot(bronze / "addresses.parquet", "address_hash", share=0.03, min_k=25)
 
     # Create shared infrastructure per ring
-    ring_shared = []
-    for _ in rings:
-        ring_shared.append(
-            {
-                "device": random.choice(hot_devices),
-                "ip": random.choice(hot_ips),
-                "card": random.choice(hot_cards),
-                "addr": random.choice(hot_addrs),
-            }
-        )
+    # One Series per infra type indexed by ring number, so a whole batch is looked up with shared.gather(ring_assign)
+    # (uniform positions + gather is the same draw as rng.choice, without leaving the Categorical)
+    shared_device = hot_devices.gather(rng.integers(0, len(hot_devices), size=n_rings))
+    shared_ip = hot_ips.gather(rng.integers(0, len(hot_ips), size=n_rings))
+    shared_card = hot_cards.gather(rng.integers(0, len(hot_cards), size=n_rings))
+    shared_addr = hot_addrs.gather(rng.integers(0, len(hot_addrs), size=n_rings))
 
     # Anchor burst windows for each ring using existing transaction timestamps
     # This anchoring ensures a temporal distribution within bounds of transaction data
-    anchor_times = random.sample(tx_ts, k=len(rings))
-
-    # Modify selected transactions
-    for idx in fraud_idx:
-        r_i = random.randrange(len(rings))
-        ring_members = rings[r_i]
-        shared = ring_shared[r_i]
-        anchor = anchor_times[r_i]
-
-        # Force transaction to be made by a ring member
-        tx_person[idx] = random.choice(ring_members)
-
-        # Make burst window around anchor time
-        jitter = timedelta(hours=random.randint(-cfg.burst_hours_window, cfg.burst_hours_window))
-        tx_ts[idx] = anchor + jitter
-
-        # Shared infrastructure with configured probabilities
-        if random.random() < cfg.shared_device_prob:
-            tx_device[idx] = shared["device"]
-        if random.random() < cfg.shared_ip_prob:
-            tx_ip[idx] = shared["ip"]
-        if random.random() < cfg.shared_card_prob:
-            tx_card[idx] = shared["card"]
-        if random.random() < cfg.shared_address_prob:
-            tx_addr[idx] = shared["addr"]
-
-    # Add is_fraud label column
-    # This is for synthetic ground truth to evaluate fraud detection models (not IRL data)
-    is_fraud = [0] * n_total
-    for idx in fraud_idx:
-        is_fraud[idx] = 1
-
-    tx_out = tx.with_columns(
-        pl.Series("person_id", tx_person),
-        pl.Series("ts", tx_ts),
-        pl.Series("device_id", tx_device),
-        pl.Series("ip", tx_ip),
-        pl.Series("card_hash", tx_card),
-        pl.Series("address_hash", tx_addr),
-        pl.Series("is_fraud", is_fraud),
+    # Sampling row indices and gathering just those rows avoids turning every ts into a Python datetime
+    anchor_idx = rnd.sample(range(n_total), k=n_rings)
+    anchor_times = tx.select(pl.col("ts").gather(anchor_idx)).collect().to_series()
+
+    # Draw every per-transaction choice in one go instead of looping over fraud_idx
+    n_sel = len(fraud_idx)
+    ring_assign = rng.integers(0, n_rings, size=n_sel)
+
+    # Force transaction to be made by a ring member: a uniform position within each row's ring slice
+    member_idx = rng.integers(ring_offsets[ring_assign], ring_offsets[ring_assign + 1])
+    patch_person = ring_members.gather(member_idx)
+
+    # Make burst window around anchor time
+    # Jitter is an int64 hour vector added as a duration, so ts stays in its own Datetime dtype throughout
+    jitter_hours = rng.integers(-cfg.burst_hours_window, cfg.burst_hours_window + 1, size=n_sel)
+    patch_ts = pl.select(anchor_times.gather(ring_assign) + pl.duration(hours=pl.Series(jitter_hours))).to_series()
+
+    # Shared infrastructure with configured probabilities
+    # One (n, 4) uniform draw compared against the four probabilities gives every share/keep mask at once
+    # Null means "keep the original value" (the ring didn't share it this time)
+    share_probs = np.array(
+        [cfg.shared_device_prob, cfg.shared_ip_prob, cfg.shared_card_prob, cfg.shared_address_prob]
+    )
+    share_mask = rng.random((n_sel, len(share_probs))) < share_probs
+
+    def shared_or_none(shared: pl.Series, mask: np.ndarray) -> pl.Series:
+        values = shared.gather(ring_assign)
+        return pl.select(pl.when(pl.Series(mask)).then(values)).to_series()
+
+    patch_device = shared_or_none(shared_device, share_mask[:, 0])
+    patch_ip = shared_or_none(shared_ip, share_mask[:, 1])
+    patch_card = shared_or_none(shared_card, share_mask[:, 2])
+    patch_addr = shared_or_none(shared_addr, share_mask[:, 3])
+
+    patch = pl.DataFrame(
+        {
+            "idx": fraud_idx,
+            "person_id_new": patch_person,
+            "ts_new": patch_ts,
+            "device_id_new": patch_device,
+            "ip_new": patch_ip,
+            "card_hash_new": patch_card,
+            "address_hash_new": patch_addr,
+        },
+        schema={
+            "idx": pl.UInt32,
+            "person_id_new": pl.Categorical,
+            "ts_new": tx.collect_schema()["ts"],
+            "device_id_new": pl.Categorical,
+            "ip_new": pl.Categorical,
+            "card_hash_new": pl.Categorical,
+            "address_hash_new": pl.Categorical,
+        },
     )
 
-    tx_out.write_parquet(bronze / "transactions.parquet")
-    print(f"Injected {len(fraud_idx)} fraud-ring transactions across {len(rings)} rings")
+    # Only the ~fraud_tx_share of rows that changed are written, instead of the whole table
+    patch.write_parquet(
+        bronze / FRAUD_PATCH_FILE,
+        compression="zstd",
+        compression_level=3,
+        row_group_size=64_000,
+        statistics=True,
+    )
+    print(f"Injected {len(fraud_idx)} fraud-ring transactions across {n_rings} rings")
 
 
 if __name__ == "__main__":